@@ -0,0 +1,8 @@
+"""VIIRS Black Marble (VNP46) nighttime light preprocessing.
+
+Submodules import GDAL, h5py, pandas and geopandas at module level, so this
+package imports none of them; use ``python -m ntl <command>`` or import the
+submodule you need.
+"""
+
+__version__ = "0.1.0"
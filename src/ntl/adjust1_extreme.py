@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 
 DEFAULT_INPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_vza.csv"
@@ -43,10 +45,14 @@ def mark_extremes(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def main() -> None:
-    data = pd.read_csv(DEFAULT_INPUT_CSV)
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Mark per-pixel NTL extremes and ntl_fix.")
+    parser.add_argument("--input-csv", default=DEFAULT_INPUT_CSV)
+    parser.add_argument("--output-csv", default=DEFAULT_OUTPUT_CSV)
+    args = parser.parse_args(argv)
+    data = pd.read_csv(args.input_csv)
     result = mark_extremes(data)
-    result.to_csv(DEFAULT_OUTPUT_CSV, index=False)
+    result.to_csv(args.output_csv, index=False)
 
 
 if __name__ == "__main__":
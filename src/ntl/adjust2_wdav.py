@@ -1,8 +1,10 @@
+import argparse
+
 import numpy as np
 import pandas as pd
 
 PIXEL_SIZE = 1 / 240
-INPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted1_extreme.csv"
+INPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted1_vza.csv"
 OUTPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted2_wdav.csv"
 
 
@@ -37,8 +39,12 @@ def compute_window_mean(pixel_means: pd.DataFrame, group_cols: list[str]) -> pd.
     return merged[group_cols + ["ix", "iy", "ntl_mis_33"]]
 
 
-def main() -> None:
-    df = pd.read_csv(INPUT_CSV)
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compute the 3x3 window mean of ntl_mis.")
+    parser.add_argument("--input-csv", default=INPUT_CSV)
+    parser.add_argument("--output-csv", default=OUTPUT_CSV)
+    args = parser.parse_args(argv)
+    df = pd.read_csv(args.input_csv)
     required = {"lon", "lat", "ntl_mis"}
     missing = required - set(df.columns)
     if missing:
@@ -55,7 +61,7 @@ def main() -> None:
 
     result = compute_window_mean(pixel_means, group_cols)
     df = df.merge(result, on=group_cols + ["ix", "iy"], how="left")
-    df.to_csv(OUTPUT_CSV, index=False)
+    df.to_csv(args.output_csv, index=False)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 
 
@@ -48,6 +50,15 @@ def compute_stats(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
-data = pd.read_csv(INPUT_CSV)
-stats = compute_stats(data)
-stats.to_csv(OUTPUT_CSV, index=False)
\ No newline at end of file
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compute the yearly mean and 16-day A factor.")
+    parser.add_argument("--input-csv", default=INPUT_CSV)
+    parser.add_argument("--output-csv", default=OUTPUT_CSV)
+    args = parser.parse_args(argv)
+    data = pd.read_csv(args.input_csv)
+    stats = compute_stats(data)
+    stats.to_csv(args.output_csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
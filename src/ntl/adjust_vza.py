@@ -0,0 +1,89 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+INPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted1.csv"
+OUTPUT_CSV = "D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted1_vza.csv"
+DEGREE = 2
+VZA_SCALE = 0.01  # Sensor_Zenith 存储值 × 0.01 = 度
+VZA_NORM = 90.0  # 拟合前把角度缩放到 [0, 1]，改善法方程的条件数
+
+
+def fit_pixel_polynomials(
+    pixel: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    n_pixels: int,
+    degree: int = DEGREE,
+) -> np.ndarray:
+    """Least-squares fit y = sum_k c_k * x**k for every pixel at once.
+
+    Returns coefficients of shape (n_pixels, degree + 1), lowest order first.
+    The per-pixel normal equations are accumulated with ``np.bincount`` and
+    solved as one batched pseudo-inverse; pixels with too few samples get NaN.
+    """
+    n_terms = degree + 1
+    moments = np.empty((n_pixels, 2 * degree + 1))
+    rhs = np.empty((n_pixels, n_terms))
+    x_pow = np.ones_like(x)
+    for k in range(2 * degree + 1):
+        moments[:, k] = np.bincount(pixel, weights=x_pow, minlength=n_pixels)
+        if k < n_terms:
+            rhs[:, k] = np.bincount(pixel, weights=x_pow * y, minlength=n_pixels)
+        x_pow = x_pow * x
+
+    index = np.arange(n_terms)
+    normal = moments[:, index[:, None] + index[None, :]]
+    coef = np.full((n_pixels, n_terms), np.nan)
+    enough = moments[:, 0] > degree
+    if enough.any():
+        coef[enough] = (
+            np.linalg.pinv(normal[enough]) @ rhs[enough][..., None]
+        )[..., 0]
+    return coef
+
+
+def correct_vza(
+    df: pd.DataFrame, degree: int = DEGREE, vza_scale: float = VZA_SCALE
+) -> pd.DataFrame:
+    required_columns = {"lon", "lat", "vza", "ntl"}
+    missing = required_columns - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+
+    df = df.copy()
+    pixel = df.groupby(["lon", "lat"], sort=False).ngroup().to_numpy()
+    n_pixels = int(pixel.max()) + 1 if pixel.size else 0
+    x = df["vza"].to_numpy(dtype=float) * vza_scale / VZA_NORM
+    y = df["ntl"].to_numpy(dtype=float)
+
+    usable = np.isfinite(x) & np.isfinite(y)
+    if "is_extreme" in df.columns:
+        usable &= (df["is_extreme"] != "T").to_numpy()
+    coef = fit_pixel_polynomials(pixel[usable], x[usable], y[usable], n_pixels, degree)
+
+    # 角度效应 = 拟合值(vza) - 拟合值(天底, vza=0)
+    pixel_coef = coef[pixel]
+    fitted = np.polynomial.polynomial.polyval(x, pixel_coef.T, tensor=False)
+    df["ntl_mis"] = fitted - pixel_coef[:, 0]
+    df["ntl_match"] = y - df["ntl_mis"].to_numpy()
+    return df
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Fit per-pixel NTL-vs-VZA polynomials and remove the angular effect."
+    )
+    parser.add_argument("--input-csv", default=INPUT_CSV)
+    parser.add_argument("--output-csv", default=OUTPUT_CSV)
+    parser.add_argument("--degree", type=int, default=DEGREE)
+    parser.add_argument("--vza-scale", type=float, default=VZA_SCALE)
+    args = parser.parse_args(argv)
+    data = pd.read_csv(args.input_csv)
+    result = correct_vza(data, args.degree, args.vza_scale)
+    result.to_csv(args.output_csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
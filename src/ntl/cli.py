@@ -0,0 +1,51 @@
+"""Single command-line entry point for the ntl preprocessing stages."""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+
+# command -> (submodule, help); submodules are imported only when their
+# command runs, so ``--help`` and short commands skip GDAL/pandas startup.
+COMMANDS = {
+    "download": ("download", "Download VNP46A1/VNP46A2 daily h5 tiles."),
+    "mosaic-a1": ("mosaic_a1", "Quality-mask VNP46A1 VZA and mosaic tiles per day."),
+    "mosaic-a2": ("mosaic_a2", "Quality-mask VNP46A2 NTL and mosaic tiles per day."),
+    "mask": ("mask", "Mask mosaics to built-up land and clip to study areas."),
+    "gapfill": ("gapfill", "Fill quality-masked gaps along the time axis."),
+    "export": ("export", "Export paired NTL/VZA GeoTIFFs to CSV."),
+    "adjust-extreme": ("adjust1_extreme", "Mark per-pixel NTL extremes."),
+    "adjust-vza": ("adjust_vza", "Fit per-pixel NTL-vs-VZA and compute ntl_mis/ntl_match."),
+    "adjust-wdav": ("adjust2_wdav", "Compute the 3x3 window mean of ntl_mis."),
+    "adjust-a": ("adjust3_a", "Compute the yearly mean and 16-day A factor."),
+    "counties": ("counties", "Join admin names from a shapefile to CSV points."),
+    "query": ("query", "Index outputs and query pixel time series."),
+    "pipeline": ("pipeline", "Run download, mosaic, mask and export per day."),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ntl",
+        description="Nighttime light preprocessing.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n"
+        + "\n".join(f"  {name:<16}{help_}" for name, (_, help_) in COMMANDS.items())
+        + "\n\nRun 'ntl <command> --help' for the options of a command.",
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    sys.argv[0] = f"ntl {args.command}"
+    module.main(args.args)
+
+
+if __name__ == "__main__":
+    main()
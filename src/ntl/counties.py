@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import argparse
 import warnings
 from pathlib import Path
 
@@ -52,22 +53,36 @@ def join_admin_name(
     joined.to_csv(output_csv, index=False)
 
 
-def main() -> None:
-    csv_path = Path(r"D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted3_A.csv")
-    shp_path = Path(r"D:/cmafiles/L/database/gis/中国专题图/省级数据/海南省/海南省.shp")
-    output_csv = Path(r"D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted_shp.csv")
-    lon_col = "lon"
-    lat_col = "lat"
-    admin_field = "分县连接成"
-    output_field = "county"
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Join admin names from a shapefile to CSV lon/lat points.")
+    parser.add_argument(
+        "--csv",
+        type=Path,
+        default=Path(r"D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted3_A.csv"),
+    )
+    parser.add_argument(
+        "--shp",
+        type=Path,
+        default=Path(r"D:/cmafiles/L/database/gis/中国专题图/省级数据/海南省/海南省.shp"),
+    )
+    parser.add_argument(
+        "--output-csv",
+        type=Path,
+        default=Path(r"D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_adjusted_shp.csv"),
+    )
+    parser.add_argument("--lon-col", default="lon")
+    parser.add_argument("--lat-col", default="lat")
+    parser.add_argument("--admin-field", default="分县连接成")
+    parser.add_argument("--output-field", default="county")
+    args = parser.parse_args(argv)
     join_admin_name(
-        csv_path=csv_path,
-        shp_path=shp_path,
-        output_csv=output_csv,
-        lon_col=lon_col,
-        lat_col=lat_col,
-        admin_field=admin_field,
-        output_field=output_field,
+        csv_path=args.csv,
+        shp_path=args.shp,
+        output_csv=args.output_csv,
+        lon_col=args.lon_col,
+        lat_col=args.lat_col,
+        admin_field=args.admin_field,
+        output_field=args.output_field,
     )
 
 
@@ -0,0 +1,120 @@
+import argparse
+import os
+import re
+import time
+import requests
+from urllib.parse import urljoin
+from urllib.parse import urlparse
+
+# ====== 参数 ======
+TOKEN = "TOKEN"
+OUTDIR = r"D:\cmafiles\L\database\nighttime\VNP46A2_2024"  # 下载目录
+# =================================
+ARCHIVE = "https://ladsweb.modaps.eosdis.nasa.gov/archive/allData/5200/"
+PRODUCT = "VNP46A2"
+YEAR = 2024
+BASE = f"{ARCHIVE}{PRODUCT}/{YEAR}/"
+TILES = {"h28v06", "h28v07", "h29v06", "h29v07"}
+H5_RE = re.compile(r'h\d{2}v\d{2}.*\.h5$', re.IGNORECASE)
+
+def list_h5_files(day_url: str, headers: dict):
+    r = requests.get(day_url, headers=headers, timeout=60)
+    r.raise_for_status()
+    html = r.text
+    # 从目录页抓所有 .h5 链接
+    files = set(re.findall(r'href="([^"]+\.h5)"', html, flags=re.IGNORECASE))
+    # 再过滤一下看起来像 h5 的
+    return sorted([f for f in files if H5_RE.search(f)])
+
+def is_target_tile(fname: str) -> bool:
+    m = re.search(r"(h\d{2}v\d{2})", fname, re.IGNORECASE)
+    return (m.group(1).lower() in TILES) if m else False
+
+def safe_filename(fname: str) -> str:
+    return fname
+
+def download_one(url: str, out_path: str, headers: dict):
+    if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
+        return "skip_exists"
+
+    tmp = out_path + ".part"
+    with requests.get(url, headers=headers, stream=True, timeout=180) as r:
+        r.raise_for_status()
+        with open(tmp, "wb") as f:
+            for chunk in r.iter_content(chunk_size=1024 * 1024):
+                if chunk:
+                    f.write(chunk)
+    os.replace(tmp, out_path)
+    return "ok"
+
+def product_base(product: str, year: int = YEAR) -> str:
+    return f"{ARCHIVE}{product}/{year}/"
+
+def download_day(d: int, base: str = BASE, outdir: str = OUTDIR, headers: dict = None):
+    """下载某一天的目标 tile，返回 (ok, skipped, errors)。"""
+    if headers is None:
+        headers = {"Authorization": f"Bearer {TOKEN}"}
+    os.makedirs(outdir, exist_ok=True)
+
+    day = f"{d:03d}"
+    day_url = urljoin(base, day + "/")
+    print(f"\n== Day {day} : {day_url}")
+
+    try:
+        files = list_h5_files(day_url, headers)
+    except Exception as e:
+        print(f"  [ERR] list failed: {e}")
+        return 0, 0, 1
+
+    target = [f for f in files if is_target_tile(f)]
+    print(f"  found {len(files)} h5, target {len(target)}")
+
+    ok = skipped = errors = 0
+    for fname in target:
+        file_url = urljoin(day_url, fname)
+
+        # 永远用 URL 的 path basename 当文件名（防止 fname 被写成完整URL）
+        out_name = os.path.basename(urlparse(file_url).path)
+        out_path = os.path.join(outdir, out_name)
+
+        try:
+            status = download_one(file_url, out_path, headers)
+            print(f"  [{status}] {out_name}")
+            if status == "ok":
+                ok += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            print(f"  [ERR] {out_name}: {e}")
+            errors += 1
+            time.sleep(1)
+    return ok, skipped, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download VNP46 daily h5 tiles from LAADS.")
+    parser.add_argument("--product", default=PRODUCT, help="VNP46A1 or VNP46A2.")
+    parser.add_argument("--year", type=int, default=YEAR)
+    parser.add_argument("--first-day", type=int, default=1)
+    parser.add_argument("--last-day", type=int, default=4)
+    parser.add_argument("--outdir", default=OUTDIR)
+    args = parser.parse_args(argv)
+
+    base = product_base(args.product, args.year)
+    os.makedirs(args.outdir, exist_ok=True)
+
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+
+    total_ok = total_skip = total_err = 0
+
+    for d in range(args.first_day, args.last_day + 1):  # 2024 闰年
+        ok, skipped, errors = download_day(d, base, args.outdir, headers)
+        total_ok += ok
+        total_skip += skipped
+        total_err += errors
+
+    print("\n==== DONE ====")
+    print(f"ok: {total_ok}, skipped: {total_skip}, errors: {total_err}")
+    print(f"saved to: {args.outdir}")
+
+if __name__ == "__main__":
+    main()
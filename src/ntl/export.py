@@ -13,6 +13,7 @@ import rasterio
 
 
 DATE_PATTERN = re.compile(r"A(\d{4})(\d{3})")
+CSV_HEADER = ["date", "lon", "lat", "ntl", "vza"]
 
 
 def parse_date_from_name(name: str) -> str:
@@ -65,6 +66,30 @@ def find_pairs(
     return pairs
 
 
+def write_pair_rows(writer, ntl_path: Path, vza_path: Path) -> None:
+    date = parse_date_from_name(ntl_path.name)
+    with rasterio.open(ntl_path) as ntl_src, rasterio.open(vza_path) as vza_src:
+        ntl = ntl_src.read(1)
+        vza = vza_src.read(1)
+
+        if ntl.shape != vza.shape:
+            raise ValueError(
+                f"Shape mismatch for {ntl_path.name} and {vza_path.name}"
+            )
+
+        # 需要 NTL 与 VZA 同时有效；只填补了 NTL 的日数据不会以 vza=NaN 导出
+        mask = np.isfinite(ntl) & np.isfinite(vza)
+        rows, cols = np.where(mask)
+        if rows.size == 0:
+            return
+
+        xs, ys = rasterio.transform.xy(
+            ntl_src.transform, rows, cols, offset="center"
+        )
+        for lon, lat, ntl_val, vza_val in zip(xs, ys, ntl[rows, cols], vza[rows, cols]):
+            writer.writerow([date, lon, lat, float(ntl_val), float(vza_val)])
+
+
 def export_csv(
     ntl_dir: Path,
     vza_dir: Path,
@@ -77,32 +102,36 @@ def export_csv(
 
     with output_csv.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.writer(handle)
-        writer.writerow(["date", "lon", "lat", "ntl", "vza"])
+        writer.writerow(CSV_HEADER)
 
         for ntl_path, vza_path in pairs:
-            date = parse_date_from_name(ntl_path.name)
-            with rasterio.open(ntl_path) as ntl_src, rasterio.open(vza_path) as vza_src:
-                ntl = ntl_src.read(1)
-                vza = vza_src.read(1)
+            write_pair_rows(writer, ntl_path, vza_path)
 
-                if ntl.shape != vza.shape:
-                    raise ValueError(
-                        f"Shape mismatch for {ntl_path.name} and {vza_path.name}"
-                    )
 
-                mask = np.isfinite(ntl)
-                rows, cols = np.where(mask)
-                if rows.size == 0:
-                    continue
-
-                xs, ys = rasterio.transform.xy(
-                    ntl_src.transform, rows, cols, offset="center"
-                )
-                for lon, lat, ntl_val, vza_val in zip(xs, ys, ntl[rows, cols], vza[rows, cols]):
-                    writer.writerow([date, lon, lat, float(ntl_val), float(vza_val)])
+def export_pair_csv(ntl_path: Path, vza_path: Path, output_csv: Path) -> None:
+    """Export a single day's NTL/VZA pair; used by the per-day pipeline."""
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    with output_csv.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(CSV_HEADER)
+        write_pair_rows(writer, ntl_path, vza_path)
 
 
-def main() -> None:
+def concat_csv(parts: list[Path], output_csv: Path) -> None:
+    """Concatenate per-day CSV parts (same header) into one file, in order."""
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    with output_csv.open("w", newline="", encoding="utf-8") as out:
+        out.write(",".join(CSV_HEADER) + "\n")
+        for part in parts:
+            if not part.exists():
+                continue
+            with part.open("r", encoding="utf-8") as handle:
+                handle.readline()
+                for line in handle:
+                    out.write(line)
+
+
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description=(
             "Export paired NTL (VNP46A1) and VZA (VNP46A2) GeoTIFFs to CSV."
@@ -138,7 +167,7 @@ def main() -> None:
         default=Path(r"D:/cmafiles/L/database/nighttime/Precess/Presults/ntl_vza.csv"),
         help="Output CSV path.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     export_csv(
         args.ntl_dir,
         args.vza_dir,
@@ -0,0 +1,235 @@
+"""Fill quality-masked gaps in daily rasters along the time axis."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from numpy.lib.stride_tricks import sliding_window_view
+from rasterio.windows import Window
+
+from .export import DATE_PATTERN
+
+MAX_GAP = 3  # 线性插值允许的最长连续缺测天数
+MEDIAN_HALF_WINDOW = 3  # 邻日中值窗口：前后各 N 天
+METHODS = ("linear", "median")
+MEMORY_MB = 512
+FILL_MASK_DIR = "fill_mask"
+FLAG_OBSERVED = 0
+FLAG_LINEAR = 1
+FLAG_MEDIAN = 2
+FLAG_NODATA = 255
+
+
+def day_number(name: str) -> int:
+    match = DATE_PATTERN.search(name)
+    if not match:
+        raise ValueError(f"Unable to parse date from filename: {name}")
+    year, day_of_year = int(match.group(1)), int(match.group(2))
+    return date(year, 1, 1).toordinal() + day_of_year - 1
+
+
+def fill_linear(cube: np.ndarray, max_gap: int = MAX_GAP) -> np.ndarray:
+    """Linearly interpolate NaN runs of at most ``max_gap`` steps along axis 0.
+
+    Runs touching the start or end of the series are left as NaN.
+    """
+    n = cube.shape[0]
+    valid = np.isfinite(cube)
+    steps = np.arange(n, dtype=np.int32).reshape((n,) + (1,) * (cube.ndim - 1))
+    prev = np.maximum.accumulate(np.where(valid, steps, -1), axis=0)
+    after = np.where(valid, steps, n)
+    nxt = np.minimum.accumulate(after[::-1], axis=0)[::-1]
+
+    fillable = ~valid & (prev >= 0) & (nxt < n) & (nxt - prev - 1 <= max_gap)
+    prev_c = np.clip(prev, 0, n - 1)
+    next_c = np.clip(nxt, 0, n - 1)
+    v0 = np.take_along_axis(cube, prev_c, axis=0)
+    v1 = np.take_along_axis(cube, next_c, axis=0)
+    span = np.maximum(next_c - prev_c, 1)
+    interp = v0 + (v1 - v0) * ((steps - prev_c) / span).astype(cube.dtype)
+    return np.where(fillable, interp, cube)
+
+
+def fill_median(cube: np.ndarray, half_window: int = MEDIAN_HALF_WINDOW) -> np.ndarray:
+    """Fill NaN with the median of valid values within ±``half_window`` steps."""
+    missing = ~np.isfinite(cube)
+    if not missing.any():
+        return cube
+    pad = [(half_window, half_window)] + [(0, 0)] * (cube.ndim - 1)
+    padded = np.pad(cube, pad, constant_values=np.nan)
+    # 只取缺测位置的窗口；排序后 NaN 在末尾，按有效个数取中位
+    ordered = sliding_window_view(padded, 2 * half_window + 1, axis=0)[missing]
+    ordered.sort(axis=-1)
+    count = np.isfinite(ordered).sum(axis=-1)
+    lo = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0)[:, None], axis=-1)[:, 0]
+    hi = np.take_along_axis(ordered, (count // 2)[:, None], axis=-1)[:, 0]
+    filled = cube.copy()
+    filled[missing] = np.where(count > 0, (lo + hi) / 2, np.nan)
+    return filled
+
+
+def fill_cube(
+    cube: np.ndarray,
+    methods: tuple[str, ...] = METHODS,
+    max_gap: int = MAX_GAP,
+    half_window: int = MEDIAN_HALF_WINDOW,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Apply ``methods`` in order; return the filled cube and per-cell flags.
+
+    Flags are ``FLAG_OBSERVED``, ``FLAG_LINEAR``, ``FLAG_MEDIAN`` or
+    ``FLAG_NODATA`` (still NaN after filling).
+    """
+    for method in methods:
+        if method not in ("linear", "median"):
+            raise ValueError(f"Unknown gap-fill method: {method}")
+    valid = np.isfinite(cube)
+    flags = np.where(valid, FLAG_OBSERVED, FLAG_NODATA).astype(np.uint8)
+    # 非建成区和裁剪区外的像元全年无值，只对至少有一天有效值的像元做填补
+    active = valid.any(axis=0)
+    if not active.any():
+        return cube, flags
+    series = cube[:, active]
+    series_flags = flags[:, active]
+    for method in methods:
+        if method == "linear":
+            series, flag = fill_linear(series, max_gap), FLAG_LINEAR
+        else:
+            series, flag = fill_median(series, half_window), FLAG_MEDIAN
+        series_flags[(series_flags == FLAG_NODATA) & np.isfinite(series)] = flag
+    filled = cube.copy()
+    filled[:, active] = series
+    flags[:, active] = series_flags
+    return filled, flags
+
+
+def gapfill_dir(
+    src_dir: Path,
+    out_dir: Path,
+    pattern: str = "*_presult.tif",
+    methods: tuple[str, ...] = METHODS,
+    max_gap: int = MAX_GAP,
+    half_window: int = MEDIAN_HALF_WINDOW,
+    memory_mb: int = MEMORY_MB,
+) -> list[Path]:
+    """Gap-fill every raster in ``src_dir`` and write same-named files to ``out_dir``.
+
+    The (day, row, col) cube is processed in row strips sized to fit
+    ``memory_mb`` and staged in an on-disk memmap under ``out_dir``, so only
+    one raster is open at a time however many days there are. Days without
+    an input file are treated as all-NaN, so gaps are measured in calendar
+    days. A uint8 fill mask with the same name
+    is written to ``out_dir / FILL_MASK_DIR`` (0 observed, 1 linear,
+    2 median, 255 no data).
+
+    Fill the VNP46A1 (VZA) and VNP46A2 (NTL) directories with the same
+    settings: both are masked by the same quality flag, so the filled cells
+    line up and export keeps them paired. Export drops rows without VZA.
+    """
+    if src_dir.resolve() == out_dir.resolve():
+        raise ValueError("out_dir must differ from src_dir")
+    files = sorted(
+        (path for path in src_dir.glob(pattern) if DATE_PATTERN.search(path.name)),
+        key=lambda path: day_number(path.name),
+    )
+    if not files:
+        raise FileNotFoundError(f"No files matching {pattern} in {src_dir}")
+    mask_dir = out_dir / FILL_MASK_DIR
+    mask_dir.mkdir(parents=True, exist_ok=True)
+
+    days = np.array([day_number(path.name) for path in files])
+    if np.unique(days).size != days.size:
+        raise ValueError(f"Several files share a date in {src_dir}")
+    slots = days - days[0]
+    n_days = int(slots[-1]) + 1
+
+    first_meta = None
+    for path in files:
+        with rasterio.open(path) as src:
+            if first_meta is None:
+                first_meta = src.meta.copy()
+            elif (src.height, src.width, src.transform) != (
+                first_meta["height"],
+                first_meta["width"],
+                first_meta["transform"],
+            ):
+                raise ValueError(f"Grid of {path.name} differs from {files[0].name}")
+    height, width = first_meta["height"], first_meta["width"]
+    meta = first_meta
+    meta.update({"dtype": "float32", "nodata": np.nan, "count": 1})
+    mask_meta = meta.copy()
+    mask_meta.update({"dtype": "uint8", "nodata": FLAG_NODATA})
+
+    # 按最坏情况（条带内像元全部有值且大部分缺测）估算每行内存：中值窗口副本
+    # (2N+1) 份、其 isfinite 掩膜、线性插值的 int32/float32 临时数组约 12 份，
+    # 另加有效像元子集与输出副本
+    per_row = n_days * width * 4 * (2 * half_window + 1 + (2 * half_window + 1) // 4 + 16)
+    strip = max(1, min(height, memory_mb * 1024 * 1024 // per_row))
+
+    # 同时打开的文件数与天数无关：逐条带逐个打开源文件，填补结果先暂存在磁盘
+    # memmap 中，最后逐日写出（每次只打开一个文件）
+    with tempfile.TemporaryDirectory(dir=out_dir) as staging:
+        staged = np.lib.format.open_memmap(
+            Path(staging) / "filled.npy", mode="w+", dtype="float32", shape=(len(files), height, width)
+        )
+        staged_flags = np.lib.format.open_memmap(
+            Path(staging) / "flags.npy", mode="w+", dtype="uint8", shape=(len(files), height, width)
+        )
+        for row0 in range(0, height, strip):
+            rows = min(strip, height - row0)
+            window = Window(0, row0, width, rows)
+            cube = np.full((n_days, rows, width), np.nan, dtype="float32")
+            for slot, path in zip(slots, files):
+                with rasterio.open(path) as src:
+                    cube[slot] = src.read(1, window=window)
+            filled, flags = fill_cube(cube, methods, max_gap, half_window)
+            staged[:, row0 : row0 + rows] = filled[slots]
+            staged_flags[:, row0 : row0 + rows] = flags[slots]
+
+        for i, path in enumerate(files):
+            with rasterio.open(out_dir / path.name, "w", **meta) as dst:
+                dst.write(staged[i], 1)
+            with rasterio.open(mask_dir / path.name, "w", **mask_meta) as dst:
+                dst.write(staged_flags[i], 1)
+        del staged, staged_flags  # Windows 下需先释放映射才能删除暂存目录
+    return [out_dir / path.name for path in files]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill quality-masked gaps in daily rasters along the time axis."
+    )
+    parser.add_argument("src_dir", type=Path, help="Directory of daily masked rasters.")
+    parser.add_argument("out_dir", type=Path, help="Output directory (same file names).")
+    parser.add_argument("--pattern", default="*_presult.tif")
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        choices=("linear", "median"),
+        default=list(METHODS),
+        help="Fill steps, applied in order.",
+    )
+    parser.add_argument("--max-gap", type=int, default=MAX_GAP, help="Longest gap (days) to interpolate.")
+    parser.add_argument(
+        "--median-half-window", type=int, default=MEDIAN_HALF_WINDOW, help="Days on each side for the median."
+    )
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB)
+    args = parser.parse_args(argv)
+    out_paths = gapfill_dir(
+        args.src_dir,
+        args.out_dir,
+        args.pattern,
+        tuple(args.methods),
+        args.max_gap,
+        args.median_half_window,
+        args.memory_mb,
+    )
+    print(f"Saved {len(out_paths)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import glob
+import os
+from collections import defaultdict
+
+import fiona
+import numpy as np
+import rasterio
+from rasterio.coords import disjoint_bounds
+from rasterio.features import bounds as geometry_bounds
+from rasterio.io import MemoryFile
+from rasterio.mask import mask
+from rasterio.merge import merge
+from rasterio.warp import reproject, Resampling, transform_geom
+
+# ====== 参数 ======
+ntl_dir = "D:/cmafiles/L/database/nighttime/Precess/VNP46A2/"
+out_dir = "D:/cmafiles/L/database/nighttime/Precess/Presult/VNP46A2"
+# 可填多个研究区 shp；多个区域时每个区域输出到 out_dir 下的同名子目录
+study_area_shps = [
+    "D:/cmafiles/L/database/gis/中国专题图/省级数据/海南省/海南省.shp",
+]
+# 若设置，则按该属性字段把多要素 shp 拆分为多个区域（同值要素合并为一个区域）
+region_field = None
+mcd12q1_files = [
+    "D:/cmafiles/L/database/nighttime/LandCover/MCD12Q1.A2024001.h28v06.061.2025206072738.hdf",
+    "D:/cmafiles/L/database/nighttime/LandCover/MCD12Q1.A2024001.h28v07.061.2025206060336.hdf",
+]
+landcover_class = 13  # IGBP: Urban and Built-up
+subdataset_keys = ("LC_Type1", "Land_Cover_Type_1", "LC_Type_1")
+
+
+def pick_subdataset(path: str) -> str:
+    with rasterio.open(path) as src:
+        for key in subdataset_keys:
+            match = next((s for s in src.subdatasets if key in s), None)
+            if match:
+                return match
+    raise RuntimeError(f"No landcover subdataset found in {path}")
+
+
+def build_landcover_mosaic():
+    srcs = []
+    for path in mcd12q1_files:
+        subdataset = pick_subdataset(path)
+        srcs.append(rasterio.open(subdataset))
+    mosaic, transform = merge(srcs)
+    meta = srcs[0].meta.copy()
+    meta.update(
+        {
+            "height": mosaic.shape[1],
+            "width": mosaic.shape[2],
+            "transform": transform,
+            "count": 1,
+        }
+    )
+    for src in srcs:
+        src.close()
+    return mosaic[0], meta
+
+
+def load_regions(shp_paths=None, field=None):
+    """Return {region_name: (shapes, crs)} for every study area."""
+    shp_paths = study_area_shps if shp_paths is None else shp_paths
+    field = region_field if field is None else field
+    regions = {}
+    for shp_path in shp_paths:
+        with fiona.open(shp_path, "r") as shp:
+            shp_crs = shp.crs_wkt or shp.crs
+            if field is None:
+                name = os.path.splitext(os.path.basename(shp_path))[0]
+                grouped = {name: [feature["geometry"] for feature in shp]}
+            else:
+                grouped = defaultdict(list)
+                for feature in shp:
+                    grouped[str(feature["properties"][field])].append(feature["geometry"])
+        for name, shapes in grouped.items():
+            if name in regions:
+                raise ValueError(f"Duplicate region name: {name}")
+            regions[name] = (shapes, shp_crs)
+    if not regions:
+        raise ValueError("No study area regions loaded.")
+    return regions
+
+
+def region_out_dir(name: str, regions: dict, root: str = None) -> str:
+    root = out_dir if root is None else root
+    return root if len(regions) == 1 else os.path.join(root, name)
+
+
+def resample_landcover(landcover, landcover_meta, ntl, cache: dict):
+    # 日拼接图网格一致时只重投影一次
+    key = (ntl.crs.to_string() if ntl.crs else None, tuple(ntl.transform), ntl.height, ntl.width)
+    if key not in cache:
+        landcover_resampled = np.zeros((ntl.height, ntl.width), dtype=landcover.dtype)
+        reproject(
+            source=landcover,
+            destination=landcover_resampled,
+            src_transform=landcover_meta["transform"],
+            src_crs=landcover_meta["crs"],
+            dst_transform=ntl.transform,
+            dst_crs=ntl.crs,
+            resampling=Resampling.nearest,
+            src_nodata=landcover_meta.get("nodata"),
+            dst_nodata=0,
+        )
+        cache[key] = landcover_resampled == landcover_class
+    return cache[key]
+
+
+def shapes_bounds(shapes) -> tuple:
+    boxes = np.array([geometry_bounds(geom) for geom in shapes])
+    return (*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0))
+
+
+def clip_shapes_for(regions: dict, dst_crs, cache: dict) -> dict:
+    """Return {region_name: (shapes, bounds)} in ``dst_crs``."""
+    key = dst_crs.to_string() if dst_crs else None
+    if key not in cache:
+        clip = {}
+        for name, (shapes, shp_crs) in regions.items():
+            if shp_crs and dst_crs and shp_crs != dst_crs:
+                shapes = [transform_geom(shp_crs, dst_crs, geom) for geom in shapes]
+            clip[name] = (shapes, shapes_bounds(shapes))
+        cache[key] = clip
+    return cache[key]
+
+
+def mask_one(ntl_path, landcover, landcover_meta, regions, cache=None, root=None):
+    """Mask one daily mosaic and write a clipped output for every region.
+
+    The mosaic is read once; each region is clipped from the same in-memory
+    array. Returns the list of written paths.
+    """
+    cache = {} if cache is None else cache
+    with rasterio.open(ntl_path) as ntl:
+        ntl_data = ntl.read(1).astype("float32")
+        builtup_mask = resample_landcover(
+            landcover, landcover_meta, ntl, cache.setdefault("landcover", {})
+        )
+        masked = np.where(builtup_mask, ntl_data, np.nan)
+        out_meta = ntl.meta.copy()
+        out_meta.update({"dtype": "float32", "nodata": np.nan})
+        clip_shapes = clip_shapes_for(regions, ntl.crs, cache.setdefault("shapes", {}))
+
+    base = os.path.basename(ntl_path)
+    product, date = base.split("_")[:2]
+    out_paths = []
+    with MemoryFile() as mem:
+        with mem.open(**out_meta) as dst:
+            dst.write(masked, 1)
+        with mem.open() as dst:
+            for name in regions:
+                shapes, shape_bounds = clip_shapes[name]
+                out_path = os.path.join(
+                    region_out_dir(name, regions, root), f"{product}_{date}_presult.tif"
+                )
+                # 区域不在当天拼接图范围内时跳过该区域并删除旧输出，其余区域照常输出
+                if disjoint_bounds(dst.bounds, shape_bounds):
+                    print(f"Skip {name} for {date}: region does not overlap {base}")
+                    if os.path.exists(out_path):
+                        os.remove(out_path)
+                    continue
+                clipped, clipped_transform = mask(dst, shapes, crop=True)
+                clipped_meta = out_meta.copy()
+                clipped_meta.update(
+                    {
+                        "height": clipped.shape[1],
+                        "width": clipped.shape[2],
+                        "transform": clipped_transform,
+                    }
+                )
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with rasterio.open(out_path, "w", **clipped_meta) as clipped_dst:
+                    clipped_dst.write(clipped)
+                out_paths.append(out_path)
+    return out_paths
+
+
+def mask_ntl_with_builtup(landcover, landcover_meta, regions=None, src_dir=None, root=None):
+    regions = load_regions() if regions is None else regions
+    src_dir = ntl_dir if src_dir is None else src_dir
+    ntl_files = sorted(glob.glob(f"{src_dir}/*.tif"))
+    cache = {}
+    for ntl_path in ntl_files:
+        for out_path in mask_one(ntl_path, landcover, landcover_meta, regions, cache, root):
+            print(f"Saved: {out_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mask daily mosaics to built-up land and clip them to study areas."
+    )
+    parser.add_argument("--ntl-dir", default=ntl_dir, help="Directory of *_mosaic.tif files.")
+    parser.add_argument("--out-dir", default=out_dir)
+    parser.add_argument(
+        "--shp", action="append", help="Study area shapefile; repeat for several regions."
+    )
+    parser.add_argument("--region-field", default=region_field)
+    args = parser.parse_args(argv)
+
+    landcover_data, landcover_meta = build_landcover_mosaic()
+    regions = load_regions(args.shp, args.region_field)
+    mask_ntl_with_builtup(landcover_data, landcover_meta, regions, args.ntl_dir, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
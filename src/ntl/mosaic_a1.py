@@ -1,3 +1,4 @@
+import argparse
 import glob
 import h5py
 import numpy as np
@@ -26,24 +27,28 @@ tile_bounds = {
     "h29v07": (110, 10, 120, 20),
 }
 
+
 # ===== 按日期分组 =====
-a1_files = sorted(glob.glob(f"{a1_dir}/*.h5"))
-a2_files = sorted(glob.glob(f"{a2_dir}/*.h5"))
+def group_a1_by_date(a1_files):
+    a1_daily = defaultdict(list)
+    for f in a1_files:
+        date = f.split(".")[1]  # AYYYYDDD
+        a1_daily[date].append(f)
+    return a1_daily
+
 
-a1_daily = defaultdict(list)
-for f in a1_files:
-    date = f.split(".")[1]  # AYYYYDDD
-    a1_daily[date].append(f)
+def build_a2_lookup(a2_files):
+    a2_lookup = defaultdict(dict)
+    for f in a2_files:
+        date = f.split(".")[1]  # AYYYYDDD
+        tile = next((t for t in tile_bounds.keys() if t in f), None)
+        if tile:
+            a2_lookup[date][tile] = f
+    return a2_lookup
 
-a2_lookup = defaultdict(dict)
-for f in a2_files:
-    date = f.split(".")[1]  # AYYYYDDD
-    tile = next((t for t in tile_bounds.keys() if t in f), None)
-    if tile:
-        a2_lookup[date][tile] = f
 
 # ===== 每日处理 =====
-for date, file_list in a1_daily.items():
+def mosaic_day(date, file_list, a2_lookup):
     datasets = []
 
     for f in file_list:
@@ -85,7 +90,7 @@ for date, file_list in a1_daily.items():
     # 拼接 mosaic
     if not datasets:
         print(f"No tiles to merge for {date}")
-        continue
+        return None
     srcs = [m.open() for m in datasets]
     mosaic, out_transform = merge(srcs)
 
@@ -108,4 +113,31 @@ for date, file_list in a1_daily.items():
     for m in datasets:
         m.close()
 
-    print(f"Saved: {out_path}")
\ No newline at end of file
+    print(f"Saved: {out_path}")
+    return out_path
+
+
+def mosaic_date(date):
+    """只处理某一天（AYYYYDDD）的文件。"""
+    a1_files = sorted(glob.glob(f"{a1_dir}/*.{date}.*.h5"))
+    a2_files = sorted(glob.glob(f"{a2_dir}/*.{date}.*.h5"))
+    return mosaic_day(date, a1_files, build_a2_lookup(a2_files))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mask VNP46A1 VZA by VNP46A2 quality flag and mosaic tiles.")
+    parser.add_argument("--date", help="Only process one day, e.g. A2024001.")
+    args = parser.parse_args(argv)
+    if args.date:
+        mosaic_date(args.date)
+        return
+
+    a1_files = sorted(glob.glob(f"{a1_dir}/*.h5"))
+    a2_files = sorted(glob.glob(f"{a2_dir}/*.h5"))
+    a2_lookup = build_a2_lookup(a2_files)
+    for date, file_list in group_a1_by_date(a1_files).items():
+        mosaic_day(date, file_list, a2_lookup)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import glob
 import h5py
 import numpy as np
@@ -23,15 +24,18 @@ tile_bounds = {
     "h29v07": (110, 10, 120, 20),
 }
 
+
 # ===== 按日期分组 =====
-files = sorted(glob.glob(f"{data_dir}/*.h5"))
-daily = defaultdict(list)
-for f in files:
-    date = f.split(".")[1]  # AYYYYDDD
-    daily[date].append(f)
+def group_by_date(files):
+    daily = defaultdict(list)
+    for f in files:
+        date = f.split(".")[1]  # AYYYYDDD
+        daily[date].append(f)
+    return daily
+
 
 # ===== 每日处理 =====
-for date, file_list in daily.items():
+def mosaic_day(date, file_list):
     datasets = []
 
     for f in file_list:
@@ -66,6 +70,9 @@ for date, file_list in daily.items():
         datasets.append(mem)
 
     # 拼接 mosaic
+    if not datasets:
+        print(f"No tiles to merge for {date}")
+        return None
     srcs = [m.open() for m in datasets]
     mosaic, out_transform = merge(srcs)
 
@@ -88,4 +95,27 @@ for date, file_list in daily.items():
     for m in datasets:
         m.close()
 
-    print(f"Saved: {out_path}")
\ No newline at end of file
+    print(f"Saved: {out_path}")
+    return out_path
+
+
+def mosaic_date(date):
+    """只处理某一天（AYYYYDDD）的文件。"""
+    return mosaic_day(date, sorted(glob.glob(f"{data_dir}/*.{date}.*.h5")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mask VNP46A2 NTL by quality flag and mosaic tiles.")
+    parser.add_argument("--date", help="Only process one day, e.g. A2024001.")
+    args = parser.parse_args(argv)
+    if args.date:
+        mosaic_date(args.date)
+        return
+
+    files = sorted(glob.glob(f"{data_dir}/*.h5"))
+    for date, file_list in group_by_date(files).items():
+        mosaic_day(date, file_list)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Run download, mosaic, mask and export as an overlapping per-day pipeline."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[str], object]
+    deps: tuple[str, ...] = ()
+    workers: int = 1
+
+
+class DayScheduler:
+    """Schedule every (stage, day) task as soon as its same-day deps finish.
+
+    Each stage has its own thread pool, so day d can be mosaicked while day
+    d+1 downloads and day d-1 is masked. Downloads and GDAL reads/writes run
+    concurrently; h5py serialises its calls behind a global lock, so the
+    mosaic stage's HDF5 reads do not overlap each other. At most ``max_days_in_flight`` days
+    are admitted at once, which bounds the intermediate files and memory held
+    between stages. A failed task skips its downstream tasks for that day only.
+    """
+
+    def __init__(self, stages: list[Stage], max_days_in_flight: int = 4) -> None:
+        if max_days_in_flight < 1:
+            raise ValueError("max_days_in_flight must be >= 1")
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {names}")
+        seen: set[str] = set()
+        for stage in stages:
+            unknown = set(stage.deps) - seen
+            if unknown:
+                raise ValueError(
+                    f"Stage '{stage.name}' depends on unknown or later stages: "
+                    f"{', '.join(sorted(unknown))}"
+                )
+            if stage.workers < 1:
+                raise ValueError(f"Stage '{stage.name}' needs at least one worker")
+            seen.add(stage.name)
+
+        self.stages = {stage.name: stage for stage in stages}
+        self.dependents: dict[str, list[str]] = {name: [] for name in names}
+        for stage in stages:
+            for dep in stage.deps:
+                self.dependents[dep].append(stage.name)
+        self.max_days_in_flight = max_days_in_flight
+
+    def _downstream(self, name: str) -> set[str]:
+        result: set[str] = set()
+        stack = list(self.dependents[name])
+        while stack:
+            current = stack.pop()
+            if current not in result:
+                result.add(current)
+                stack.extend(self.dependents[current])
+        return result
+
+    def run(self, days: Iterable[str]) -> dict[tuple[str, str], BaseException]:
+        """Run all stages for ``days``; return failures keyed by (stage, day)."""
+        pools = {
+            name: ThreadPoolExecutor(stage.workers, thread_name_prefix=name)
+            for name, stage in self.stages.items()
+        }
+        window = threading.BoundedSemaphore(self.max_days_in_flight)
+        lock = threading.Lock()
+        all_done = threading.Event()
+        waiting: dict[str, dict[str, set[str]]] = {}
+        remaining: dict[str, int] = {}
+        skipped: dict[str, set[str]] = {}
+        errors: dict[tuple[str, str], BaseException] = {}
+        state = {"open_days": 0, "fed": False}
+
+        def submit(name: str, day: str) -> None:
+            future = pools[name].submit(self.stages[name].func, day)
+            future.add_done_callback(lambda f: on_done(name, day, f))
+
+        def on_done(name: str, day: str, future) -> None:
+            ready = []
+            with lock:
+                finished = 1
+                exc = future.exception()
+                if exc is not None:
+                    errors[(name, day)] = exc
+                    print(f"[ERR] {name} {day}: {exc}")
+                    lost = self._downstream(name) - skipped[day]
+                    skipped[day] |= lost
+                    finished += len(lost)
+                else:
+                    for child in self.dependents[name]:
+                        if child in skipped[day]:
+                            continue
+                        waiting[day][child].discard(name)
+                        if not waiting[day][child]:
+                            ready.append(child)
+                remaining[day] -= finished
+                day_done = remaining[day] == 0
+                if day_done:
+                    del waiting[day], remaining[day], skipped[day]
+                    state["open_days"] -= 1
+                    if state["fed"] and state["open_days"] == 0:
+                        all_done.set()
+            if day_done:
+                window.release()
+            for child in ready:
+                submit(child, day)
+
+        try:
+            for day in days:
+                window.acquire()
+                with lock:
+                    waiting[day] = {
+                        name: set(stage.deps) for name, stage in self.stages.items()
+                    }
+                    remaining[day] = len(self.stages)
+                    skipped[day] = set()
+                    state["open_days"] += 1
+                    roots = [name for name, deps in waiting[day].items() if not deps]
+                for name in roots:
+                    submit(name, day)
+            with lock:
+                state["fed"] = True
+                if state["open_days"] == 0:
+                    all_done.set()
+            all_done.wait()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+        return errors
+
+
+def build_stages(args: argparse.Namespace) -> tuple[list[Stage], Callable[[], None]]:
+    from . import download, export, mosaic_a1, mosaic_a2
+    from . import mask as masking
+
+    headers = {"Authorization": f"Bearer {download.TOKEN}"}
+    a1_base = download.product_base("VNP46A1", args.year)
+    a2_base = download.product_base("VNP46A2", args.year)
+    for path in (mosaic_a1.a1_dir, mosaic_a2.data_dir, mosaic_a1.out_dir, mosaic_a2.out_dir):
+        os.makedirs(path, exist_ok=True)
+
+    landcover, landcover_meta = masking.build_landcover_mosaic()
+    regions = masking.load_regions()
+    mask_cache: dict = {}
+    presult_root = os.path.dirname(masking.out_dir.rstrip("/\\"))
+    a1_root = os.path.join(presult_root, "VNP46A1")
+    a2_root = os.path.join(presult_root, "VNP46A2")
+    parts_dir = Path(presult_root) / "ntl_vza_parts"
+    days = list(day_keys(args.year, args.first_day, args.last_day))
+
+    def doy(day: str) -> int:
+        return int(day[5:])
+
+    def mosaic_path(module, product: str, day: str) -> str:
+        return f"{module.out_dir}/{product}_{day}_mosaic.tif"
+
+    def mask_product(module, product: str, root: str) -> Callable[[str], None]:
+        def run(day: str) -> None:
+            path = mosaic_path(module, product, day)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Missing mosaic: {path}")
+            for out_path in masking.mask_one(
+                path, landcover, landcover_meta, regions, mask_cache, root
+            ):
+                print(f"Saved: {out_path}")
+
+        return run
+
+    exported: set[str] = set()
+    exported_lock = threading.Lock()
+
+    def export_day(day: str) -> None:
+        for name in regions:
+            part = parts_dir / name / f"ntl_vza_{day}.csv"
+            # 先删除上次运行留下的分片，失败的日期不会混入旧数据
+            part.unlink(missing_ok=True)
+            ntl_path = Path(masking.region_out_dir(name, regions, a2_root)) / f"VNP46A2_{day}_presult.tif"
+            vza_path = Path(masking.region_out_dir(name, regions, a1_root)) / f"VNP46A1_{day}_presult.tif"
+            if not ntl_path.exists() and not vza_path.exists():
+                continue  # 该区域与当天拼接图不重叠
+            export.export_pair_csv(ntl_path, vza_path, part)
+        with exported_lock:
+            exported.add(day)
+
+    def finish() -> None:
+        done = [day for day in days if day in exported]
+        for name in regions:
+            out_dir = Path(masking.region_out_dir(name, regions, presult_root))
+            parts = [parts_dir / name / f"ntl_vza_{day}.csv" for day in done]
+            export.concat_csv(parts, out_dir / "ntl_vza.csv")
+            print(f"Saved: {out_dir / 'ntl_vza.csv'}")
+
+    def fetch(base: str, outdir: str) -> Callable[[str], None]:
+        def run(day: str) -> None:
+            _, _, errors = download.download_day(doy(day), base, outdir, headers)
+            if errors:
+                raise RuntimeError(f"{errors} download error(s)")
+
+        return run
+
+    stages = [
+        Stage("download_a1", fetch(a1_base, mosaic_a1.a1_dir), (), args.download_workers),
+        Stage("download_a2", fetch(a2_base, mosaic_a2.data_dir), (), args.download_workers),
+        Stage("mosaic_a1", mosaic_a1.mosaic_date, ("download_a1", "download_a2"), args.mosaic_workers),
+        Stage("mosaic_a2", mosaic_a2.mosaic_date, ("download_a2",), args.mosaic_workers),
+        Stage("mask_a1", mask_product(mosaic_a1, "VNP46A1", a1_root), ("mosaic_a1",), args.mask_workers),
+        Stage("mask_a2", mask_product(mosaic_a2, "VNP46A2", a2_root), ("mosaic_a2",), args.mask_workers),
+        Stage("export", export_day, ("mask_a1", "mask_a2"), args.export_workers),
+    ]
+    return stages, finish
+
+
+def day_keys(year: int, first_day: int, last_day: int) -> Iterable[str]:
+    for d in range(first_day, last_day + 1):
+        yield f"A{year}{d:03d}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run download -> mosaic -> mask -> export per day, overlapping days."
+    )
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--first-day", type=int, default=1, help="First day of year.")
+    parser.add_argument("--last-day", type=int, default=366, help="Last day of year.")
+    parser.add_argument("--max-days-in-flight", type=int, default=4)
+    parser.add_argument("--download-workers", type=int, default=4)
+    parser.add_argument("--mosaic-workers", type=int, default=2)
+    parser.add_argument("--mask-workers", type=int, default=2)
+    parser.add_argument("--export-workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    stages, finish = build_stages(args)
+    scheduler = DayScheduler(stages, args.max_days_in_flight)
+    errors = scheduler.run(day_keys(args.year, args.first_day, args.last_day))
+    finish()
+    print("\n==== DONE ====")
+    print(f"failed tasks: {len(errors)}")
+
+
+if __name__ == "__main__":
+    main()
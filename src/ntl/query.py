@@ -0,0 +1,404 @@
+"""Pixel time-series queries over *_presult.tif outputs and adjusted tables."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.windows import Window
+
+from .adjust2_wdav import PIXEL_SIZE
+from .export import DATE_PATTERN, parse_date_from_name
+
+RASTER_INDEX_NAME = "presult_index.json"
+TABLE_INDEX_SUFFIX = ".idx"
+TILE_SIZE = 32
+MAX_TILES = 64  # 每个缓存项为 (天数, 32, 32) float32，366 天约 1.5 MB，默认上限约 96 MB
+
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used mapping."""
+
+    def __init__(self, max_items: int = MAX_TILES) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+        self.max_items = max_items
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def file_stats(paths: list[Path]) -> list[list]:
+    return [[path.name, path.stat().st_size, path.stat().st_mtime] for path in paths]
+
+
+def list_rasters(raster_dir: Path, pattern: str) -> list[Path]:
+    return sorted(path for path in raster_dir.glob(pattern) if DATE_PATTERN.search(path.name))
+
+
+def build_raster_index(
+    raster_dir: Path, pattern: str = "*_presult.tif", index_path: Path | None = None
+) -> Path:
+    """Record the shared grid and the date -> file list of a presult directory."""
+    files = list_rasters(raster_dir, pattern)
+    if not files:
+        raise FileNotFoundError(f"No files matching {pattern} in {raster_dir}")
+    dates = [parse_date_from_name(path.name) for path in files]
+    if len(set(dates)) != len(dates):
+        # 例如 VNP46A1 (VZA) 与 VNP46A2 (NTL) 在同一目录，需用 pattern 选定一个产品
+        raise ValueError(
+            f"Several files share a date in {raster_dir}; narrow the pattern to one product"
+        )
+
+    grid = None
+    for path in files:
+        with rasterio.open(path) as src:
+            current = {
+                "crs": src.crs.to_wkt() if src.crs else None,
+                "transform": list(src.transform)[:6],
+                "width": src.width,
+                "height": src.height,
+            }
+        if grid is None:
+            grid = current
+        elif current != grid:
+            raise ValueError(f"Grid of {path.name} differs from {files[0].name}")
+
+    index = {
+        "pattern": pattern,
+        "grid": grid,
+        "files": [[date, path.name] for date, path in zip(dates, files)],
+        "stats": file_stats(files),
+    }
+    index_path = raster_dir / RASTER_INDEX_NAME if index_path is None else index_path
+    with index_path.open("w", encoding="utf-8") as handle:
+        json.dump(index, handle)
+    return index_path
+
+
+class RasterSeries:
+    """Point and bounding-box time series from an indexed presult directory.
+
+    The cache unit is a (day, ``TILE_SIZE``, ``TILE_SIZE``) cube read from all
+    files at once, so one cached tile serves the full series of every pixel
+    in it, and a handful of locations fit in a small bounded LRU.
+    """
+
+    def __init__(
+        self,
+        raster_dir: Path,
+        index_path: Path | None = None,
+        max_tiles: int = MAX_TILES,
+        tile_size: int = TILE_SIZE,
+        pattern: str | None = None,
+    ) -> None:
+        self.raster_dir = raster_dir
+        index_path = raster_dir / RASTER_INDEX_NAME if index_path is None else index_path
+        if not index_path.exists():
+            build_raster_index(raster_dir, pattern or "*_presult.tif", index_path)
+        with index_path.open("r", encoding="utf-8") as handle:
+            index = json.load(handle)
+        pattern = index["pattern"] if pattern is None else pattern
+        # 换 pattern、文件增删或同名重写（大小/修改时间变化）都会重建索引
+        on_disk = file_stats(list_rasters(raster_dir, pattern))
+        if index["pattern"] != pattern or index.get("stats") != on_disk:
+            build_raster_index(raster_dir, pattern, index_path)
+            with index_path.open("r", encoding="utf-8") as handle:
+                index = json.load(handle)
+        grid = index["grid"]
+        self.transform = rasterio.Affine(*grid["transform"])
+        self.width = grid["width"]
+        self.height = grid["height"]
+        self.dates = [date for date, _ in index["files"]]
+        self.paths = [raster_dir / name for _, name in index["files"]]
+        self.tile_size = tile_size
+        self.cache = LRUCache(max_tiles)
+        self._datasets: dict[int, rasterio.io.DatasetReader] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            for dataset in self._datasets.values():
+                dataset.close()
+            self._datasets.clear()
+
+    def __enter__(self) -> RasterSeries:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _dataset(self, file_idx: int):
+        with self._lock:
+            if file_idx not in self._datasets:
+                self._datasets[file_idx] = rasterio.open(self.paths[file_idx])
+            return self._datasets[file_idx]
+
+    def _tile(self, tile_row: int, tile_col: int) -> np.ndarray:
+        key = (tile_row, tile_col)
+        tile = self.cache.get(key)
+        if tile is None:
+            size = self.tile_size
+            row0, col0 = tile_row * size, tile_col * size
+            window = Window(
+                col0, row0, min(size, self.width - col0), min(size, self.height - row0)
+            )
+            tile = np.stack(
+                [self._dataset(i).read(1, window=window) for i in range(len(self.paths))]
+            )
+            self.cache.put(key, tile)
+        return tile
+
+    def rowcol(self, lon: float, lat: float) -> tuple[int, int]:
+        col, row = ~self.transform * (lon, lat)
+        row, col = int(np.floor(row)), int(np.floor(col))
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError(f"Point ({lon}, {lat}) is outside the indexed grid")
+        return row, col
+
+    def point(self, lon: float, lat: float) -> pd.DataFrame:
+        row, col = self.rowcol(lon, lat)
+        size = self.tile_size
+        values = self._tile(row // size, col // size)[:, row % size, col % size]
+        return pd.DataFrame({"date": self.dates, "value": values.astype(float)})
+
+    def bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> pd.DataFrame:
+        inverse = ~self.transform
+        cols, rows = zip(*(inverse * (x, y) for x in (min_lon, max_lon) for y in (min_lat, max_lat)))
+        row0 = max(int(np.floor(min(rows))), 0)
+        row1 = min(int(np.ceil(max(rows))), self.height)
+        col0 = max(int(np.floor(min(cols))), 0)
+        col1 = min(int(np.ceil(max(cols))), self.width)
+        if row0 >= row1 or col0 >= col1:
+            raise ValueError("Bounding box does not overlap the indexed grid")
+
+        size = self.tile_size
+        block = np.empty((len(self.paths), row1 - row0, col1 - col0), dtype=float)
+        for tile_row in range(row0 // size, (row1 - 1) // size + 1):
+            for tile_col in range(col0 // size, (col1 - 1) // size + 1):
+                tile = self._tile(tile_row, tile_col)
+                r0 = max(row0, tile_row * size)
+                r1 = min(row1, tile_row * size + tile.shape[1])
+                c0 = max(col0, tile_col * size)
+                c1 = min(col1, tile_col * size + tile.shape[2])
+                block[:, r0 - row0 : r1 - row0, c0 - col0 : c1 - col0] = tile[
+                    :,
+                    r0 - tile_row * size : r1 - tile_row * size,
+                    c0 - tile_col * size : c1 - tile_col * size,
+                ]
+        tt, rr, cc = np.nonzero(np.isfinite(block))
+        xs, ys = rasterio.transform.xy(self.transform, rr + row0, cc + col0, offset="center")
+        return pd.DataFrame(
+            {
+                "date": np.asarray(self.dates, dtype=object)[tt],
+                "lon": np.asarray(xs, dtype=float),
+                "lat": np.asarray(ys, dtype=float),
+                "value": block[tt, rr, cc],
+            }
+        )
+
+
+def pixel_keys(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    # 按 (ix, iy) 排序的 int64 键，iy 可为负
+    return ix.astype(np.int64) * (1 << 32) + (iy.astype(np.int64) + (1 << 31))
+
+
+def build_table_index(csv_path: Path, index_dir: Path | None = None) -> Path:
+    """Write a pixel-sorted column store (one .npy per column) next to a CSV."""
+    index_dir = Path(f"{csv_path}{TABLE_INDEX_SUFFIX}") if index_dir is None else index_dir
+    df = pd.read_csv(csv_path)
+    for col in ("lon", "lat", "date"):
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in {csv_path}")
+    df["date"] = pd.to_datetime(df["date"])
+    ix = np.floor(df["lon"].to_numpy() / PIXEL_SIZE).astype(np.int64)
+    iy = np.floor(df["lat"].to_numpy() / PIXEL_SIZE).astype(np.int64)
+    keys = pixel_keys(ix, iy)
+    order = np.lexsort((df["date"].to_numpy(), keys))
+    df = df.iloc[order].reset_index(drop=True)
+    keys = keys[order]
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    unique_keys, starts = np.unique(keys, return_index=True)
+    np.save(index_dir / "keys.npy", unique_keys)
+    np.save(index_dir / "starts.npy", np.append(starts, len(keys)))
+
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col == "date":
+            np.save(index_dir / "date.npy", series.to_numpy(dtype="datetime64[ns]"))
+            columns[col] = {"kind": "date"}
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            np.save(index_dir / f"{col}.npy", series.to_numpy())
+            columns[col] = {"kind": "array"}
+        else:
+            codes, categories = pd.factorize(series)
+            np.save(index_dir / f"{col}.npy", codes.astype(np.int32))
+            columns[col] = {"kind": "codes", "categories": [str(c) for c in categories]}
+
+    stat = csv_path.stat()
+    meta = {
+        "source": str(csv_path),
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "columns": columns,
+    }
+    with (index_dir / "meta.json").open("w", encoding="utf-8") as handle:
+        json.dump(meta, handle, ensure_ascii=False)
+    return index_dir
+
+
+class TableSeries:
+    """Point and bounding-box lookups on an indexed adjusted table.
+
+    Columns are memory-mapped; a lookup is a binary search on the sorted pixel
+    keys followed by a contiguous slice, so only the matching rows are read.
+    The index is rebuilt when the source CSV changes.
+    """
+
+    def __init__(self, csv_path: Path, index_dir: Path | None = None) -> None:
+        index_dir = Path(f"{csv_path}{TABLE_INDEX_SUFFIX}") if index_dir is None else index_dir
+        meta_path = index_dir / "meta.json"
+        if not meta_path.exists() or self._stale(csv_path, meta_path):
+            build_table_index(csv_path, index_dir)
+        with meta_path.open("r", encoding="utf-8") as handle:
+            self.columns = json.load(handle)["columns"]
+        self.keys = np.load(index_dir / "keys.npy")
+        self.starts = np.load(index_dir / "starts.npy")
+        self.data = {
+            col: np.load(index_dir / f"{col}.npy", mmap_mode="r") for col in self.columns
+        }
+
+    @staticmethod
+    def _stale(csv_path: Path, meta_path: Path) -> bool:
+        if not csv_path.exists():
+            return False
+        with meta_path.open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        stat = csv_path.stat()
+        return meta["source_size"] != stat.st_size or meta["source_mtime"] != stat.st_mtime
+
+    def _rows(self, row_slices: list[tuple[int, int]]) -> pd.DataFrame:
+        if row_slices:
+            rows = np.concatenate([np.arange(a, b) for a, b in row_slices])
+        else:
+            rows = np.empty(0, dtype=np.int64)
+        frame = {}
+        for col, info in self.columns.items():
+            values = np.asarray(self.data[col][rows])
+            if info["kind"] == "codes":
+                categories = np.asarray(info["categories"] + [None], dtype=object)
+                values = categories[values]  # code -1 (NaN) -> None
+            frame[col] = values
+        return pd.DataFrame(frame)
+
+    def point(self, lon: float, lat: float) -> pd.DataFrame:
+        key = pixel_keys(
+            np.array([np.floor(lon / PIXEL_SIZE)]), np.array([np.floor(lat / PIXEL_SIZE)])
+        )[0]
+        pos = np.searchsorted(self.keys, key)
+        if pos == len(self.keys) or self.keys[pos] != key:
+            return self._rows([])
+        return self._rows([(self.starts[pos], self.starts[pos + 1])])
+
+    def bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> pd.DataFrame:
+        ix0, ix1 = (int(np.floor(v / PIXEL_SIZE)) for v in (min_lon, max_lon))
+        iy0, iy1 = (int(np.floor(v / PIXEL_SIZE)) for v in (min_lat, max_lat))
+        lo, hi = pixel_keys(np.array([ix0, ix1]), np.array([iy0, iy1]))
+        first = np.searchsorted(self.keys, lo, side="left")
+        last = np.searchsorted(self.keys, hi, side="right")
+        candidates = np.arange(first, last)
+        iy = (self.keys[candidates] % (1 << 32)) - (1 << 31)
+        hits = candidates[(iy >= iy0) & (iy <= iy1)]
+        return self._rows([(self.starts[p], self.starts[p + 1]) for p in hits])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Index presult rasters / adjusted tables and query pixel time series."
+    )
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    index_rasters = sub.add_parser("index-rasters", help="Index a *_presult.tif directory.")
+    index_rasters.add_argument("raster_dir", type=Path)
+    index_rasters.add_argument("--pattern", default="*_presult.tif")
+
+    index_table = sub.add_parser("index-table", help="Index an adjusted CSV table.")
+    index_table.add_argument("csv", type=Path)
+
+    for action in ("point", "bbox"):
+        query = sub.add_parser(action, help=f"{action.capitalize()} time-series lookup.")
+        source = query.add_mutually_exclusive_group(required=True)
+        source.add_argument("--raster-dir", type=Path)
+        source.add_argument("--table", type=Path)
+        query.add_argument(
+            "--pattern", help="Raster glob, e.g. VNP46A2_*_presult.tif (with --raster-dir)."
+        )
+        if action == "point":
+            query.add_argument("--lon", type=float, required=True)
+            query.add_argument("--lat", type=float, required=True)
+        else:
+            query.add_argument(
+                "--bounds",
+                type=float,
+                nargs=4,
+                required=True,
+                metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"),
+            )
+        query.add_argument("--output-csv", type=Path)
+
+    args = parser.parse_args(argv)
+    if args.action == "index-rasters":
+        print(f"Saved: {build_raster_index(args.raster_dir, args.pattern)}")
+        return
+    if args.action == "index-table":
+        print(f"Saved: {build_table_index(args.csv)}")
+        return
+
+    if args.raster_dir is not None:
+        series = RasterSeries(args.raster_dir, pattern=args.pattern)
+    else:
+        series = TableSeries(args.table)
+    if args.action == "point":
+        result = series.point(args.lon, args.lat)
+    else:
+        result = series.bbox(*args.bounds)
+    if isinstance(series, RasterSeries):
+        series.close()
+
+    if args.output_csv is not None:
+        args.output_csv.parent.mkdir(parents=True, exist_ok=True)
+        result.to_csv(args.output_csv, index=False)
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
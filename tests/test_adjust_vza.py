@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ntl.adjust_vza import VZA_NORM, VZA_SCALE, correct_vza, fit_pixel_polynomials
+
+P = np.polynomial.polynomial
+
+
+def synthetic_table(n_pixels=40, n_days=30, seed=0):
+    rng = np.random.default_rng(seed)
+    pixel = np.repeat(np.arange(n_pixels), n_days)
+    vza = rng.uniform(0, 7000, pixel.size)
+    coef = rng.normal(size=(n_pixels, 3)) * [10, 5, 3] + [20, 0, 0]
+    x = vza * VZA_SCALE / VZA_NORM
+    ntl = coef[pixel, 0] + coef[pixel, 1] * x + coef[pixel, 2] * x**2
+    ntl = ntl + rng.normal(0, 0.1, pixel.size)
+    df = pd.DataFrame(
+        {"lon": 110 + pixel / 240, "lat": 20.0, "vza": vza, "ntl": ntl}
+    )
+    return df, pixel, x
+
+
+def test_fit_matches_per_pixel_polyfit():
+    df, pixel, x = synthetic_table()
+    y = df["ntl"].to_numpy()
+    coef = fit_pixel_polynomials(pixel, x, y, pixel.max() + 1, degree=2)
+    for p in range(pixel.max() + 1):
+        sel = pixel == p
+        np.testing.assert_allclose(coef[p], P.polyfit(x[sel], y[sel], 2), rtol=1e-6, atol=1e-6)
+
+
+def test_pixels_with_too_few_samples_get_nan():
+    pixel = np.array([0, 0, 0, 1, 1])
+    x = np.array([0.1, 0.2, 0.3, 0.1, 0.2])
+    y = np.array([1.0, 2.0, 3.5, 1.0, 2.0])
+    coef = fit_pixel_polynomials(pixel, x, y, 2, degree=2)
+    assert np.isfinite(coef[0]).all()
+    assert np.isnan(coef[1]).all()
+
+
+def test_correct_vza_matches_polyfit_and_skips_extremes():
+    df, pixel, x = synthetic_table(n_pixels=10)
+    df["is_extreme"] = "F"
+    df.loc[df.index[::7], "is_extreme"] = "T"
+    df.loc[df.index[::7], "ntl"] += 500.0
+
+    result = correct_vza(df)
+
+    for p in range(pixel.max() + 1):
+        sel = (pixel == p) & (df["is_extreme"] == "F").to_numpy()
+        fit = P.polyfit(x[sel], df["ntl"].to_numpy()[sel], 2)
+        expected_mis = P.polyval(x[pixel == p], fit) - fit[0]
+        np.testing.assert_allclose(result["ntl_mis"][pixel == p], expected_mis, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(result["ntl_match"], result["ntl"] - result["ntl_mis"])
+
+
+def test_correct_vza_requires_columns():
+    with pytest.raises(ValueError):
+        correct_vza(pd.DataFrame({"lon": [1.0], "lat": [1.0], "ntl": [1.0]}))
@@ -0,0 +1,134 @@
+import sys
+
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+
+from rasterio.transform import from_origin  # noqa: E402
+
+from ntl.gapfill import (  # noqa: E402
+    FILL_MASK_DIR,
+    FLAG_LINEAR,
+    FLAG_MEDIAN,
+    FLAG_NODATA,
+    FLAG_OBSERVED,
+    fill_cube,
+    fill_linear,
+    fill_median,
+    gapfill_dir,
+)
+
+nan = np.nan
+
+
+def series(values):
+    return np.array(values, dtype="float32")[:, None]
+
+
+def test_linear_fills_inner_gaps_up_to_max_gap():
+    s = series([nan, 1, nan, nan, 4, nan, nan, nan, nan, 9, nan])
+    out = fill_linear(s, max_gap=3)[:, 0]
+    np.testing.assert_allclose(out[1:5], [1, 2, 3, 4])
+    assert np.isnan(out[5:9]).all()  # gap of 4 > max_gap
+    assert np.isnan(out[0]) and np.isnan(out[-1])  # edges are not extrapolated
+
+
+def test_linear_gap_exactly_max_gap_is_filled():
+    out = fill_linear(series([0, nan, nan, 3]), max_gap=2)[:, 0]
+    np.testing.assert_allclose(out, [0, 1, 2, 3])
+
+
+def test_median_uses_valid_neighbours_only():
+    s = series([nan, 1, nan, nan, 4, nan, nan, nan, nan, 9, nan])
+    out = fill_median(s, half_window=1)[:, 0]
+    np.testing.assert_allclose(out[:6], [1, 1, 1, 4, 4, 4])
+    assert np.isnan(out[6:8]).all()
+    np.testing.assert_allclose(out[8:], [9, 9, 9])
+
+
+def test_all_nan_series_stays_nan():
+    s = np.full((10, 2), nan, dtype="float32")
+    s[:, 1] = np.arange(10)
+    s[4, 1] = nan
+    filled, flags = fill_cube(s)
+    assert np.isnan(filled[:, 0]).all()
+    assert (flags[:, 0] == FLAG_NODATA).all()
+    assert filled[4, 1] == pytest.approx(4)
+    assert flags[4, 1] == FLAG_LINEAR
+
+
+def test_flags_mark_method_used():
+    s = series([0, nan, 2, nan, nan, nan, nan, 7, 8])
+    filled, flags = fill_cube(s, max_gap=1, half_window=2)
+    assert flags[0, 0] == FLAG_OBSERVED
+    assert flags[1, 0] == FLAG_LINEAR
+    assert flags[3, 0] == FLAG_MEDIAN
+    assert np.isfinite(filled).all()
+
+
+def read_band(path):
+    with rasterio.open(path) as src:
+        return src.read(1)
+
+
+def write_days(directory, cubes):
+    height, width = cubes.shape[1:]
+    meta = {
+        "driver": "GTiff",
+        "height": height,
+        "width": width,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:4326",
+        "transform": from_origin(110, 20, 1 / 240, 1 / 240),
+        "nodata": nan,
+    }
+    directory.mkdir()
+    for d, day in enumerate(cubes, start=1):
+        with rasterio.open(directory / f"VNP46A2_A2024{d:03d}_presult.tif", "w", **meta) as dst:
+            dst.write(day, 1)
+
+
+def test_gapfill_dir_is_independent_of_strip_size(tmp_path):
+    rng = np.random.default_rng(0)
+    cube = rng.random((20, 12, 9)).astype("float32")
+    cube[rng.random(cube.shape) < 0.4] = nan
+    cube[:, :3, :3] = nan  # pixels without any data
+    write_days(tmp_path / "src", cube)
+
+    results = []
+    for name, memory_mb in (("small", 0), ("large", 512)):
+        out = tmp_path / name
+        paths = gapfill_dir(tmp_path / "src", out, memory_mb=memory_mb)
+        values = np.stack([read_band(p) for p in paths])
+        masks = np.stack([read_band(out / FILL_MASK_DIR / p.name) for p in paths])
+        results.append((values, masks))
+
+    np.testing.assert_array_equal(results[0][0], results[1][0])
+    np.testing.assert_array_equal(results[0][1], results[1][1])
+    expected, expected_flags = fill_cube(cube)
+    np.testing.assert_allclose(results[1][0], expected)
+    np.testing.assert_array_equal(results[1][1], expected_flags)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs the resource module")
+def test_gapfill_dir_open_files_do_not_grow_with_days(tmp_path):
+    import resource
+
+    rng = np.random.default_rng(1)
+    cube = rng.random((120, 4, 5)).astype("float32")
+    cube[rng.random(cube.shape) < 0.3] = nan
+    write_days(tmp_path / "src", cube)
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limit = 64  # well below 3 handles x 120 days
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(limit, hard), hard))
+    try:
+        paths = gapfill_dir(tmp_path / "src", tmp_path / "out", memory_mb=0)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+    assert len(paths) == 120
+    expected, _ = fill_cube(cube)
+    np.testing.assert_allclose(np.stack([read_band(p) for p in paths]), expected)
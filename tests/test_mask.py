@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+fiona = pytest.importorskip("fiona")
+
+from rasterio.transform import from_origin  # noqa: E402
+
+from ntl.mask import landcover_class, load_regions, mask_one  # noqa: E402
+
+RES = 1 / 240
+ORIGIN = (110.0, 20.0)
+
+
+def box_bounds(col0, row0, col1, row1):
+    return (
+        ORIGIN[0] + col0 * RES,
+        ORIGIN[1] - row1 * RES,
+        ORIGIN[0] + col1 * RES,
+        ORIGIN[1] - row0 * RES,
+    )
+
+
+def box(col0, row0, col1, row1):
+    """Polygon covering grid columns [col0, col1) and rows [row0, row1)."""
+    x0, y0, x1, y1 = box_bounds(col0, row0, col1, row1)
+    return {"type": "Polygon", "coordinates": [[(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]]}
+
+
+def write_regions(path, features):
+    schema = {"geometry": "Polygon", "properties": {"county": "str"}}
+    with fiona.open(path, "w", driver="ESRI Shapefile", crs="EPSG:4326", schema=schema) as shp:
+        for name, geometry in features:
+            shp.write({"geometry": geometry, "properties": {"county": name}})
+
+
+@pytest.fixture
+def mosaic(tmp_path):
+    data = np.arange(30 * 40, dtype="float32").reshape(30, 40)
+    meta = {
+        "driver": "GTiff",
+        "height": 30,
+        "width": 40,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:4326",
+        "transform": from_origin(*ORIGIN, RES, RES),
+    }
+    path = tmp_path / "VNP46A2_A2024001_mosaic.tif"
+    with rasterio.open(path, "w", **meta) as dst:
+        dst.write(data, 1)
+    landcover = np.full(data.shape, landcover_class, dtype="uint8")
+    landcover[:, :5] = 0  # 非建成区
+    landcover_meta = {"transform": meta["transform"], "crs": meta["crs"], "nodata": None}
+    return path, data, landcover, landcover_meta
+
+
+def test_mask_one_clips_each_region_and_skips_disjoint_ones(tmp_path, mosaic):
+    ntl_path, data, landcover, landcover_meta = mosaic
+    shp = tmp_path / "counties.shp"
+    write_regions(
+        shp,
+        [
+            ("a", box(2, 3, 8, 10)),
+            ("a", box(8, 3, 12, 6)),  # 同名要素合并为一个区域
+            ("b", box(20, 15, 35, 28)),
+            ("far", box(2000, 3, 2010, 10)),
+        ],
+    )
+    regions = load_regions([str(shp)], "county")
+    assert sorted(regions) == ["a", "b", "far"]
+
+    root = tmp_path / "out"
+    stale = root / "far" / "VNP46A2_A2024001_presult.tif"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"old")
+
+    out_paths = mask_one(str(ntl_path), landcover, landcover_meta, regions, root=str(root))
+
+    assert sorted(out_paths) == [
+        str(root / name / "VNP46A2_A2024001_presult.tif") for name in ("a", "b")
+    ]
+    assert not stale.exists()
+
+    with rasterio.open(root / "a" / "VNP46A2_A2024001_presult.tif") as src:
+        assert src.bounds == pytest.approx(rasterio.coords.BoundingBox(*box_bounds(2, 3, 12, 10)))
+        clipped = src.read(1)
+    assert np.isnan(clipped[:, :3]).all()  # 非建成区
+    np.testing.assert_array_equal(clipped[:3, 3:], data[3:6, 5:12])
+    assert np.isnan(clipped[3:, 6:]).all()  # 外接矩形内、区域外
+
+    with rasterio.open(root / "b" / "VNP46A2_A2024001_presult.tif") as src:
+        assert src.bounds == pytest.approx(rasterio.coords.BoundingBox(*box_bounds(20, 15, 35, 28)))
+        np.testing.assert_array_equal(src.read(1), data[15:28, 20:35])
+
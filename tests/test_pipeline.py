@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from ntl.pipeline import DayScheduler, Stage
+
+DAYS = [f"A2024{d:03d}" for d in range(1, 7)]
+
+
+def recorder(name, log, lock, fail_on=None, delay=0.0):
+    def run(day):
+        time.sleep(delay)
+        with lock:
+            log.append((name, day))
+        if day == fail_on:
+            raise RuntimeError("boom")
+
+    return run
+
+
+def test_stages_run_after_their_same_day_dependencies():
+    log, lock = [], threading.Lock()
+    stages = [
+        Stage("a", recorder("a", log, lock), (), 2),
+        Stage("b", recorder("b", log, lock), (), 2),
+        Stage("c", recorder("c", log, lock), ("a", "b"), 2),
+        Stage("d", recorder("d", log, lock), ("c",), 1),
+    ]
+    errors = DayScheduler(stages, max_days_in_flight=3).run(DAYS)
+
+    assert errors == {}
+    assert len(log) == len(stages) * len(DAYS)
+    position = {entry: i for i, entry in enumerate(log)}
+    for day in DAYS:
+        assert position[("a", day)] < position[("c", day)]
+        assert position[("b", day)] < position[("c", day)]
+        assert position[("c", day)] < position[("d", day)]
+
+
+def test_failure_skips_only_that_days_downstream_stages():
+    log, lock = [], threading.Lock()
+    stages = [
+        Stage("a", recorder("a", log, lock)),
+        Stage("b", recorder("b", log, lock, fail_on="A2024003")),
+        Stage("c", recorder("c", log, lock), ("a",)),
+        Stage("d", recorder("d", log, lock), ("b",)),
+        Stage("e", recorder("e", log, lock), ("c", "d")),
+    ]
+    errors = DayScheduler(stages).run(DAYS)
+
+    assert list(errors) == [("b", "A2024003")]
+    ran = {name for name, day in log if day == "A2024003"}
+    assert ran == {"a", "b", "c"}
+    for day in DAYS:
+        if day != "A2024003":
+            assert {name for name, d in log if d == day} == {"a", "b", "c", "d", "e"}
+
+
+def test_days_in_flight_are_bounded():
+    lock = threading.Lock()
+    open_days: set[str] = set()
+    peak = [0]
+
+    def start(day):
+        with lock:
+            open_days.add(day)
+            peak[0] = max(peak[0], len(open_days))
+        time.sleep(0.01)
+
+    def end(day):
+        time.sleep(0.02)
+        with lock:
+            open_days.discard(day)
+
+    stages = [Stage("start", start, (), 4), Stage("end", end, ("start",), 4)]
+    errors = DayScheduler(stages, max_days_in_flight=2).run(DAYS)
+
+    assert errors == {}
+    assert peak[0] <= 2
+
+
+def test_empty_day_list_returns_immediately():
+    assert DayScheduler([Stage("a", lambda day: None)]).run([]) == {}
+
+
+def test_rejects_unknown_or_later_dependencies():
+    with pytest.raises(ValueError):
+        DayScheduler([Stage("a", print, ("b",)), Stage("b", print)])
@@ -0,0 +1,233 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+
+from rasterio.transform import from_origin  # noqa: E402
+
+from ntl.adjust2_wdav import PIXEL_SIZE  # noqa: E402
+from ntl.query import (  # noqa: E402
+    LRUCache,
+    RasterSeries,
+    TableSeries,
+    build_raster_index,
+    pixel_keys,
+)
+
+nan = np.nan
+RES = 1 / 240
+ORIGIN = (110.0, 20.0)
+
+
+def write_days(directory, cube, product="VNP46A2"):
+    height, width = cube.shape[1:]
+    meta = {
+        "driver": "GTiff",
+        "height": height,
+        "width": width,
+        "count": 1,
+        "dtype": "float32",
+        "crs": "EPSG:4326",
+        "transform": from_origin(*ORIGIN, RES, RES),
+        "nodata": nan,
+    }
+    directory.mkdir(exist_ok=True)
+    for d, day in enumerate(cube, start=1):
+        with rasterio.open(directory / f"{product}_A2024{d:03d}_presult.tif", "w", **meta) as dst:
+            dst.write(day, 1)
+
+
+def random_cube(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    cube = rng.random(shape).astype("float32")
+    cube[rng.random(shape) < 0.2] = nan
+    return cube
+
+
+def pixel_center(row, col):
+    return ORIGIN[0] + (col + 0.5) * RES, ORIGIN[1] - (row + 0.5) * RES
+
+
+def test_pixel_keys_sort_by_ix_then_signed_iy():
+    ix = np.array([-2, -2, -2, 0, 0, 3])
+    iy = np.array([-5, -1, 4, -(1 << 31), (1 << 31) - 1, -7])
+    keys = pixel_keys(ix, iy)
+    assert (np.diff(keys) > 0).all()
+    np.testing.assert_array_equal((keys % (1 << 32)) - (1 << 31), iy)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_raster_point_matches_full_read_across_tiles(tmp_path):
+    cube = random_cube((5, 11, 10))  # not a multiple of the tile size
+    write_days(tmp_path, cube)
+    with RasterSeries(tmp_path, tile_size=4) as series:
+        for row, col in ((0, 0), (3, 3), (4, 4), (7, 9), (10, 8), (10, 9)):
+            result = series.point(*pixel_center(row, col))
+            np.testing.assert_array_equal(result["value"].to_numpy(), cube[:, row, col])
+        assert result["date"].tolist() == [f"2024-01-0{d}" for d in range(1, 6)]
+        with pytest.raises(ValueError):
+            series.point(ORIGIN[0] - RES, ORIGIN[1] - RES)
+
+
+def test_raster_bbox_matches_full_read_across_tile_edges(tmp_path):
+    cube = random_cube((4, 11, 10), seed=1)
+    write_days(tmp_path, cube)
+    # 边界不落在格网线上，跨越 tile_size=4 的多个分块边缘并超出栅格右下角
+    bounds = (ORIGIN[0] + 2.3 * RES, ORIGIN[1] - 12.5 * RES, ORIGIN[0] + 9.6 * RES, ORIGIN[1] - 3.2 * RES)
+    with RasterSeries(tmp_path, tile_size=4) as series:
+        result = series.bbox(*bounds)
+
+    rows, cols = np.mgrid[: cube.shape[1], : cube.shape[2]]
+    lon, lat = pixel_center(rows, cols)
+    inside = (
+        (lon + RES / 2 > bounds[0])
+        & (lon - RES / 2 < bounds[2])
+        & (lat + RES / 2 > bounds[1])
+        & (lat - RES / 2 < bounds[3])
+    )
+    dates = [f"2024-01-0{d}" for d in range(1, 5)]
+    expected = pd.DataFrame(
+        [
+            (dates[t], lon[r, c], lat[r, c], float(cube[t, r, c]))
+            for t in range(cube.shape[0])
+            for r, c in zip(*np.nonzero(inside))
+            if np.isfinite(cube[t, r, c])
+        ],
+        columns=["date", "lon", "lat", "value"],
+    )
+    order = ["date", "lon", "lat"]
+    pd.testing.assert_frame_equal(
+        result.sort_values(order).reset_index(drop=True),
+        expected.sort_values(order).reset_index(drop=True),
+    )
+
+
+def test_raster_index_rebuilds_when_a_file_is_rewritten(tmp_path):
+    cube = random_cube((3, 6, 6), seed=2)
+    write_days(tmp_path, cube)
+    with RasterSeries(tmp_path) as series:
+        assert series.point(*pixel_center(2, 2))["value"].iloc[0] == pytest.approx(cube[0, 2, 2])
+
+    cube[0] = 42.0
+    write_days(tmp_path, cube[:1])  # 同名重写，大小可能不变
+    path = tmp_path / "VNP46A2_A2024001_presult.tif"
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    path.with_name("VNP46A2_A2024009_presult.tif").write_bytes(path.read_bytes())
+
+    with RasterSeries(tmp_path) as series:
+        values = series.point(*pixel_center(2, 2))
+    assert values["date"].tolist() == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-09"]
+    assert values["value"].iloc[0] == 42.0
+
+
+def test_raster_series_tile_cache_is_bounded(tmp_path):
+    write_days(tmp_path, random_cube((2, 8, 8), seed=3))
+    with RasterSeries(tmp_path, max_tiles=1, tile_size=4) as series:
+        series.point(*pixel_center(0, 0))
+        series.point(*pixel_center(1, 1))  # same tile
+        series.point(*pixel_center(5, 5))  # evicts the first tile
+        series.point(*pixel_center(0, 0))
+        assert len(series.cache) == 1
+        assert (series.cache.hits, series.cache.misses) == (1, 3)
+
+
+def test_raster_index_rejects_mixed_products(tmp_path):
+    cube = random_cube((2, 4, 4))
+    write_days(tmp_path, cube, "VNP46A1")
+    write_days(tmp_path, cube * 2, "VNP46A2")
+    with pytest.raises(ValueError, match="share a date"):
+        build_raster_index(tmp_path)
+    with RasterSeries(tmp_path, pattern="VNP46A2_*_presult.tif") as series:
+        values = series.point(*pixel_center(1, 1))["value"].to_numpy()
+    np.testing.assert_array_equal(values, cube[:, 1, 1] * 2)
+
+
+@pytest.fixture
+def table(tmp_path):
+    rng = np.random.default_rng(4)
+    ix = rng.integers(-3, 4, 300) + int(110 / PIXEL_SIZE)
+    iy = rng.integers(-4, 4, 300)  # 赤道两侧，iy 有正有负
+    df = pd.DataFrame(
+        {
+            "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, 300), unit="D"),
+            "lon": (ix + 0.5) * PIXEL_SIZE,
+            "lat": (iy + 0.5) * PIXEL_SIZE,
+            "ntl": rng.random(300),
+            "is_extreme": rng.choice(["T", "F"], 300),
+        }
+    )
+    path = tmp_path / "ntl_vza.csv"
+    df.to_csv(path, index=False)
+    expected = pd.read_csv(path)
+    expected["date"] = pd.to_datetime(expected["date"])
+    return path, expected
+
+
+def brute_force(df, min_lon, min_lat, max_lon, max_lat):
+    ix = np.floor(df["lon"] / PIXEL_SIZE)
+    iy = np.floor(df["lat"] / PIXEL_SIZE)
+    sel = (
+        (ix >= np.floor(min_lon / PIXEL_SIZE))
+        & (ix <= np.floor(max_lon / PIXEL_SIZE))
+        & (iy >= np.floor(min_lat / PIXEL_SIZE))
+        & (iy <= np.floor(max_lat / PIXEL_SIZE))
+    )
+    return df[sel]
+
+
+def assert_same_rows(result, expected):
+    order = ["lon", "lat", "date", "ntl"]
+    pd.testing.assert_frame_equal(
+        result.sort_values(order).reset_index(drop=True),
+        expected.sort_values(order).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_table_point_matches_pandas_filter(table):
+    path, df = table
+    series = TableSeries(path)
+    for _, row in df.sample(10, random_state=0).iterrows():
+        lon, lat = row["lon"], row["lat"]
+        assert_same_rows(series.point(lon, lat), brute_force(df, lon, lat, lon, lat))
+    assert series.point(0.0, 0.0).empty
+
+
+def test_table_bbox_matches_pandas_filter(table):
+    path, df = table
+    series = TableSeries(path)
+    lon0 = 110 - 2 * PIXEL_SIZE
+    # 中间几列的 iy 超出范围，需按 iy 过滤键区间内的候选
+    for bounds in (
+        (lon0, -2.5 * PIXEL_SIZE, lon0 + 3 * PIXEL_SIZE, 1.5 * PIXEL_SIZE),
+        (lon0, -3.5 * PIXEL_SIZE, lon0, -0.5 * PIXEL_SIZE),
+        (lon0 - 10 * PIXEL_SIZE, -10 * PIXEL_SIZE, lon0 + 10 * PIXEL_SIZE, 10 * PIXEL_SIZE),
+    ):
+        assert_same_rows(series.bbox(*bounds), brute_force(df, *bounds))
+
+
+def test_table_index_rebuilds_when_csv_changes(table):
+    path, df = table
+    TableSeries(path)
+    df = df.iloc[:50].assign(ntl=-1.0)
+    df.to_csv(path, index=False)
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    result = TableSeries(path).bbox(-180, -90, 180, 90)
+    assert len(result) == 50
+    assert (result["ntl"] == -1.0).all()